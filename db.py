@@ -1,8 +1,11 @@
 import os
+import asyncio
+import threading
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
 # Load environment variables
 load_dotenv()
@@ -14,114 +17,180 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME'),
 }
 
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+
+# Connection pool created once at import time. Pooled connections' close()
+# returns them to the pool instead of tearing down the TCP session, so the
+# per-call connect/auth round-trip disappears.
+POOL = pooling.MySQLConnectionPool(
+    pool_name='bot',
+    pool_size=DB_POOL_SIZE,
+    pool_reset_session=False,
+    **DB_CONFIG,
+)
+
 def get_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    return POOL.get_connection()
+
+@contextmanager
+def cursor(dictionary=False, commit=False, prepared=False):
+    """Yield a cursor from a pooled connection, releasing both on exit.
+
+    Guarantees the connection goes back to the pool even when the query
+    raises, which the old open/close-per-function code did not.
 
-def is_user_allowed(user_id: int) -> bool:
+    prepared=True uses a server-side prepared statement; with
+    pool_reset_session=False the server keeps the parsed statement
+    across checkouts, so repeat executes only ship parameters.
+    """
+    conn = get_connection()
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1 FROM allowed_users WHERE user_id = %s', (user_id,))
-        result = cursor.fetchone()
-        cursor.close()
+        if prepared:
+            cur = conn.cursor(prepared=True)
+        else:
+            cur = conn.cursor(dictionary=dictionary)
+        try:
+            yield cur
+            if commit:
+                conn.commit()
+        except Exception:
+            # With pool_reset_session=False a failed transaction would
+            # ride back into the pool and leak into the next checkout;
+            # discard it before the connection is returned
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+    finally:
         conn.close()
-        return result is not None
+
+# In-memory cache of allowed user IDs, mirroring the pattern in filedb.py.
+# is_user_allowed runs on every inbound update, so it must not hit MySQL.
+_allowed_ids: Set[int] = set()
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+def _ensure_cache():
+    """Load the allowed-users set from MySQL once, on first use."""
+    global _cache_loaded
+    if _cache_loaded:
+        return
+    with _cache_lock:
+        if _cache_loaded:
+            return
+        with cursor() as cur:
+            cur.execute('SELECT user_id FROM allowed_users')
+            _allowed_ids.update(row[0] for row in cur.fetchall())
+        _cache_loaded = True
+
+# The public API is async so handlers never block the aiogram event loop
+# on MySQL I/O: each coroutine runs its blocking body in a worker thread
+# via asyncio.to_thread, while cache hits are answered inline.
+
+def _is_user_allowed_blocking(user_id: int) -> bool:
+    try:
+        _ensure_cache()
+        return user_id in _allowed_ids
     except Error as e:
         print(f"DB error in is_user_allowed: {e}")
         return False
 
-def add_user(user_id: int, username: Optional[str]) -> bool:
+async def is_user_allowed(user_id: int) -> bool:
+    if _cache_loaded:
+        return user_id in _allowed_ids
+    return await asyncio.to_thread(_is_user_allowed_blocking, user_id)
+
+def _add_user_blocking(user_id: int, username: Optional[str]) -> bool:
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('REPLACE INTO allowed_users (user_id, username) VALUES (%s, %s)', (user_id, username))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with cursor(commit=True, prepared=True) as cur:
+            cur.execute('REPLACE INTO allowed_users (user_id, username) VALUES (%s, %s)', (user_id, username))
+        with _cache_lock:
+            _allowed_ids.add(user_id)
         return True
     except Error as e:
         print(f"DB error in add_user: {e}")
         return False
 
-def upsert_user(user_id: int, username: Optional[str], full_name: Optional[str]):
-    """Insert or update user in users table on /start."""
+async def add_user(user_id: int, username: Optional[str]) -> bool:
+    return await asyncio.to_thread(_add_user_blocking, user_id, username)
+
+def _upsert_user_blocking(user_id: int, username: Optional[str], full_name: Optional[str]):
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO users (user_id, username, full_name, first_seen)
-            VALUES (%s, %s, %s, NOW())
-            ON DUPLICATE KEY UPDATE username=VALUES(username), full_name=VALUES(full_name)
-        ''', (user_id, username, full_name))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with cursor(commit=True, prepared=True) as cur:
+            cur.execute('''
+                INSERT INTO users (user_id, username, full_name, first_seen)
+                VALUES (%s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE username=VALUES(username), full_name=VALUES(full_name)
+            ''', (user_id, username, full_name))
         return True
     except Error as e:
         print(f"DB error in upsert_user: {e}")
         return False
 
-def get_user_by_id(user_id: int):
+async def upsert_user(user_id: int, username: Optional[str], full_name: Optional[str]):
+    """Insert or update user in users table on /start."""
+    return await asyncio.to_thread(_upsert_user_blocking, user_id, username, full_name)
+
+def _get_user_by_id_blocking(user_id: int):
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return user
+        with cursor(dictionary=True) as cur:
+            cur.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
+            return cur.fetchone()
     except Error as e:
         print(f"DB error in get_user_by_id: {e}")
         return None
 
-def list_all_users():
+async def get_user_by_id(user_id: int):
+    return await asyncio.to_thread(_get_user_by_id_blocking, user_id)
+
+def _list_all_users_blocking():
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('SELECT * FROM users ORDER BY first_seen ASC')
-        users = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return users
+        with cursor(dictionary=True) as cur:
+            cur.execute('SELECT * FROM users ORDER BY first_seen ASC')
+            return cur.fetchall()
     except Error as e:
         print(f"DB error in list_all_users: {e}")
         return []
 
-def add_allowed_user_from_user(user: dict) -> bool:
+async def list_all_users():
+    return await asyncio.to_thread(_list_all_users_blocking)
+
+def _add_allowed_user_from_user_blocking(user: dict) -> bool:
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('REPLACE INTO allowed_users (user_id, username) VALUES (%s, %s)', (user['user_id'], user['username']))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with cursor(commit=True, prepared=True) as cur:
+            cur.execute('REPLACE INTO allowed_users (user_id, username) VALUES (%s, %s)', (user['user_id'], user['username']))
+        with _cache_lock:
+            _allowed_ids.add(user['user_id'])
         return True
     except Error as e:
         print(f"DB error in add_allowed_user_from_user: {e}")
         return False
 
-def remove_user(user_id: int) -> bool:
+async def add_allowed_user_from_user(user: dict) -> bool:
+    return await asyncio.to_thread(_add_allowed_user_from_user_blocking, user)
+
+def _remove_user_blocking(user_id: int) -> bool:
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM allowed_users WHERE user_id = %s', (user_id,))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with cursor(commit=True, prepared=True) as cur:
+            cur.execute('DELETE FROM allowed_users WHERE user_id = %s', (user_id,))
+        with _cache_lock:
+            _allowed_ids.discard(user_id)
         return True
     except Error as e:
         print(f"DB error in remove_user: {e}")
         return False
 
-def list_allowed_users() -> List[Dict]:
+async def remove_user(user_id: int) -> bool:
+    return await asyncio.to_thread(_remove_user_blocking, user_id)
+
+def _list_allowed_users_blocking() -> List[Dict]:
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('SELECT user_id, username, added_at FROM allowed_users ORDER BY added_at DESC')
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return results
+        with cursor(dictionary=True) as cur:
+            cur.execute('SELECT user_id, username, added_at FROM allowed_users ORDER BY added_at DESC')
+            return cur.fetchall()
     except Error as e:
         print(f"DB error in list_allowed_users: {e}")
         return []
+
+async def list_allowed_users() -> List[Dict]:
+    return await asyncio.to_thread(_list_allowed_users_blocking)
@@ -1,15 +1,27 @@
+import asyncio
 import json
 import os
 import logging
 from datetime import datetime
 from typing import List, Dict, Optional, Set
 
-USERS_FILE = 'users.json'
+try:
+    import orjson  # 3-10x faster than stdlib json, parses/emits bytes directly
+except ImportError:
+    orjson = None
+
+USERS_FILE = 'users.jsonl'
+LEGACY_USERS_FILE = 'users.json'
 ALLOWED_USERS_FILE = 'allowed_users.json'
 
 # In-memory cache for allowed user IDs for performance
 _allowed_user_ids_cache: Set[int] = set()
 
+# In-memory index of users keyed by user id, backed by an append-only
+# JSONL log so inserts are a single write() instead of a full rewrite.
+_users_by_id: Dict[int, Dict] = {}
+_users_loaded = False
+
 # --- Cache Management ---
 
 def load_allowed_users_cache():
@@ -22,55 +34,126 @@ def load_allowed_users_cache():
 
 # --- Utility Functions ---
 
+# Parsed-JSON cache keyed by filename, holding (st_mtime_ns, data).
+# In the steady state a load is one os.stat instead of a read + parse.
+_json_cache: Dict[str, tuple] = {}
+
 def load_json(filename: str) -> List[Dict]:
-    if not os.path.exists(filename):
-        return []
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        mtime = os.stat(filename).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = _json_cache.get(filename)
+    if cached is not None and cached[0] == mtime:
+        # Hand out a copy: callers mutating the returned list must not
+        # poison the cached master (the next save replaces it wholesale)
+        return list(cached[1])
+    with open(filename, 'rb') as f:
+        raw = f.read()
+    if not raw:
         return []
+    # Writes are atomic (tmp file + os.replace), so a partial file can't
+    # occur; let genuinely corrupt data surface instead of silently
+    # rebuilding from an empty list.
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _json_cache[filename] = (mtime, data)
+    return list(data)
 
 def save_json(filename: str, data: List[Dict]):
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Write to a temp file and rename so a crash mid-write can never
+    # leave a truncated JSON behind.
+    tmp_path = filename + '.tmp'
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, indent=2))
+    os.replace(tmp_path, filename)
+    # Keep the cache warm so the writer's next load doesn't re-parse.
+    _json_cache[filename] = (os.stat(filename).st_mtime_ns, data)
 
 # --- General User Management ---
 
-def upsert_user(user_id: int, username: str, first_name: str) -> bool:
-    users = load_json(USERS_FILE)
-    if any(u['id'] == user_id for u in users):
+def _ensure_users_cache():
+    """Stream the users JSONL log into the in-memory index, once.
+
+    Migrates a legacy users.json list to the JSONL log on first run.
+    """
+    global _users_loaded
+    if _users_loaded:
+        return
+    if not os.path.exists(USERS_FILE) and os.path.exists(LEGACY_USERS_FILE):
+        for user in load_json(LEGACY_USERS_FILE):
+            _users_by_id[user['id']] = user
+        _compact_users()
+        _users_loaded = True
+        logging.info(f"Migrated {len(_users_by_id)} users from {LEGACY_USERS_FILE} to {USERS_FILE}.")
+        return
+    if os.path.exists(USERS_FILE):
+        with open(USERS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    user = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                _users_by_id[user['id']] = user
+    _users_loaded = True
+
+def _compact_users():
+    """Atomically rewrite the JSONL log from the in-memory index."""
+    tmp_path = USERS_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for user in _users_by_id.values():
+            f.write(json.dumps(user, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, USERS_FILE)
+
+def _append_user_line(user_entry: Dict):
+    with open(USERS_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(user_entry, ensure_ascii=False) + '\n')
+
+async def upsert_user(user_id: int, username: str, first_name: str) -> bool:
+    """Insert the user if unseen; the disk append runs off the event loop."""
+    _ensure_users_cache()
+    if user_id in _users_by_id:
         return True  # Already exists
-    
+
     user_entry = {
         'id': user_id,
         'username': username or '',
         'first_name': first_name or '',
         'date_joined': datetime.now().isoformat()
     }
-    users.append(user_entry)
-    save_json(USERS_FILE, users)
+    await asyncio.to_thread(_append_user_line, user_entry)
+    _users_by_id[user_id] = user_entry
     return True
 
 def get_user_by_id(user_id: int) -> Optional[Dict]:
-    users = load_json(USERS_FILE)
-    return next((user for user in users if user['id'] == user_id), None)
+    _ensure_users_cache()
+    return _users_by_id.get(user_id)
 
 def list_all_users() -> List[Dict]:
-    return load_json(USERS_FILE)
+    _ensure_users_cache()
+    return list(_users_by_id.values())
 
 # --- Allowed Users Management (with Caching) ---
 
-def add_allowed_user_from_user(user: Dict) -> bool:
+def _append_allowed_user(user: Dict):
+    allowed_list = load_json(ALLOWED_USERS_FILE)
+    allowed_list.append(user)
+    save_json(ALLOWED_USERS_FILE, allowed_list)
+
+async def add_allowed_user_from_user(user: Dict) -> bool:
     """Adds a user to the allowed list and updates the cache."""
     user_id = user['id']
     if user_id in _allowed_user_ids_cache:
         return True  # Already allowed
 
-    allowed_list = load_json(ALLOWED_USERS_FILE)
-    allowed_list.append(user)
-    save_json(ALLOWED_USERS_FILE, allowed_list)
-    
+    await asyncio.to_thread(_append_allowed_user, user)
+
     # Update cache
     _allowed_user_ids_cache.add(user_id)
     return True
@@ -78,20 +161,22 @@ def add_allowed_user_from_user(user: Dict) -> bool:
 def list_allowed_users() -> List[Dict]:
     return load_json(ALLOWED_USERS_FILE)
 
-def remove_allowed_user(user_id: int) -> bool:
+def _remove_allowed_user_from_file(user_id: int) -> bool:
+    allowed_list = load_json(ALLOWED_USERS_FILE)
+    new_allowed = [u for u in allowed_list if u['id'] != user_id]
+    if len(new_allowed) == len(allowed_list):
+        return False  # Should not happen if cache is consistent
+    save_json(ALLOWED_USERS_FILE, new_allowed)
+    return True
+
+async def remove_allowed_user(user_id: int) -> bool:
     """Removes a user from the allowed list and updates the cache."""
     if user_id not in _allowed_user_ids_cache:
         return False # Not found in cache, so not in file either
 
-    allowed_list = load_json(ALLOWED_USERS_FILE)
-    initial_count = len(allowed_list)
-    new_allowed = [u for u in allowed_list if u['id'] != user_id]
+    if not await asyncio.to_thread(_remove_allowed_user_from_file, user_id):
+        return False
 
-    if len(new_allowed) == initial_count:
-        return False # Should not happen if cache is consistent
-
-    save_json(ALLOWED_USERS_FILE, new_allowed)
-    
     # Update cache
     _allowed_user_ids_cache.remove(user_id)
     return True
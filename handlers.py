@@ -1,8 +1,9 @@
+import asyncio
+import contextlib
 import logging
 import os
 import tempfile
-from io import BytesIO
-from datetime import datetime, timedelta
+import time
 from typing import List, Dict, Any, Optional, Union
 from aiogram import Bot, types
 from aiogram.filters import Command
@@ -21,44 +22,129 @@ from config import MIN_INTERVAL_BETWEEN_FILES, ADMIN_IDS
 from utils import (
     extract_text_from_file, 
     extract_questions_from_text, 
-    send_telegram_quizzes, 
+    send_telegram_quizzes,
     format_quiz_as_text,
     save_questions_to_file,
-    get_temp_file_path)
+    get_temp_file_path,
+    prune_chat_buckets)
 from filedb import is_user_allowed, add_allowed_user_from_user, list_allowed_users, upsert_user
 from keyboards import get_main_keyboard, get_admin_keyboard
 from handlers_admin import handle_admin_text_message
-from states import user_states, States
+from states import get_ctx, user_contexts, States, TokenBucket
 
 logger = logging.getLogger(__name__)
 
-# Storage for temporary quiz batches
-user_quiz_batches = {}
-# Rate limiting
-user_last_file_time: Dict[int, float] = {}
+# Quiz batches, rate-limit timestamps and extraction results all live on
+# the per-user UserCtx in states.py; only the quiz numbering counter is
+# kept here since it is keyed by chat id rather than user id.
 quiz_counter: Dict[int, int] = {}  # To manage sequential quiz numbering
 
-# Create keyboards
+# Quiz batches expire after an hour; deadlines are monotonic floats
+# since they are never shown to the user
+_BATCH_TTL_SECONDS = 3600.0
+_JANITOR_INTERVAL_SECONDS = 300.0
+
+async def session_janitor():
+    """Periodically evict expired batches and stale user contexts.
+
+    Without this, abandoned sessions (and their collected Poll objects)
+    stay referenced for the bot's lifetime.
+    """
+    while True:
+        await asyncio.sleep(_JANITOR_INTERVAL_SECONDS)
+        now = time.monotonic()
+        stale = []
+        for user_id, ctx in user_contexts.items():
+            if ctx.batch and ctx.batch['expires_at'] < now:
+                ctx.batch = None
+            if ctx.extracted and now - ctx.extracted['timestamp'] > _BATCH_TTL_SECONDS:
+                ctx.extracted = None
+            bucket_idle = ctx.file_bucket is None or now - ctx.file_bucket.last > _BATCH_TTL_SECONDS
+            if ctx.state == States.IDLE and ctx.batch is None and ctx.extracted is None and bucket_idle:
+                stale.append(user_id)
+        for user_id in stale:
+            user_contexts.pop(user_id, None)
+            quiz_counter.pop(user_id, None)
+        prune_chat_buckets(_BATCH_TTL_SECONDS)
+        if stale:
+            logger.info(f"Janitor evicted {len(stale)} idle user sessions.")
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"  # Option letter lookup for formatting
+
+def _unlink_quiet(path):
+    """Remove a file in one syscall, tolerating a missing or None path."""
+    try:
+        os.unlink(path)
+    except (FileNotFoundError, TypeError):
+        pass
+
+def _split_into_parts(formatted: List[str], limit: int = 4000) -> List[str]:
+    """Group formatted questions into message-sized parts.
+
+    Walks the list once, accumulating lengths, so the full output is
+    never joined and re-sliced; each part is joined from its own
+    questions only. Oversized single questions are hard-split.
+    """
+    parts = []
+    current: List[str] = []
+    current_len = 0
+    for text in formatted:
+        if len(text) > limit:
+            if current:
+                parts.append("\n\n".join(current))
+                current, current_len = [], 0
+            parts.extend(text[i:i + limit] for i in range(0, len(text), limit))
+            continue
+        extra = len(text) + (2 if current else 0)
+        if current and current_len + extra > limit:
+            parts.append("\n\n".join(current))
+            current, current_len = [text], len(text)
+        else:
+            current.append(text)
+            current_len += extra
+    if current:
+        parts.append("\n\n".join(current))
+    return parts
+
+async def _reply_in_parts(message: Message, parts: List[str]):
+    """Send numbered parts concurrently, capped at 3 in flight.
+
+    Parts are labelled and independent, so overlapping the Telegram
+    round-trips is safe; the semaphore keeps within per-chat limits.
+    """
+    semaphore = asyncio.Semaphore(3)
+    total = len(parts)
+
+    async def _send(i: int, part: str):
+        async with semaphore:
+            await message.reply(f"Part {i}/{total}:\n\n{part}")
+
+    await asyncio.gather(*(_send(i, part) for i, part in enumerate(parts, 1)))
+
+# Keyboards are immutable value objects, so build them once at import
+# time instead of re-running pydantic validation on every button press.
+
+_QUIZ_CREATION_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Finish Extraction", callback_data="finish_extraction")],
+        [InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_extraction")]
+    ]
+)
+
+_FILE_PROCESSING_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="📊 Show Extracted Questions", callback_data="show_questions")],
+        [InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_processing")]
+    ]
+)
 
 def get_quiz_creation_keyboard() -> InlineKeyboardMarkup:
-    """Create the quiz creation keyboard"""
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="✅ Finish Extraction", callback_data="finish_extraction")],
-            [InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_extraction")]
-        ]
-    )
-    return keyboard
+    """Return the shared quiz creation keyboard"""
+    return _QUIZ_CREATION_KEYBOARD
 
 def get_file_processing_keyboard() -> InlineKeyboardMarkup:
-    """Create the file processing keyboard"""
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="📊 Show Extracted Questions", callback_data="show_questions")],
-            [InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_processing")]
-        ]
-    )
-    return keyboard
+    """Return the shared file processing keyboard"""
+    return _FILE_PROCESSING_KEYBOARD
 
 async def start_command(message: types.Message):
     """Handle /start command. Upsert user into users.json."""
@@ -67,14 +153,14 @@ async def start_command(message: types.Message):
     username = message.from_user.username or ''
     first_name = message.from_user.first_name if hasattr(message.from_user, 'first_name') else ''
     try:
-        success = upsert_user(user_id, username, first_name)
+        success = await upsert_user(user_id, username, first_name)
         if not success:
             await message.reply("⚠️ Could not store your user info. Please try again later.")
     except Exception as e:
         import logging
         logging.exception("Failed to upsert user on /start")
         await message.reply("⚠️ Error saving your user info. Please contact admin.")
-    user_states[user_id] = States.IDLE
+    get_ctx(user_id).state = States.IDLE
     await message.answer(
         "👋 Welcome to the Quiz Bot!\n\n"
         "This bot can:\n"
@@ -108,8 +194,8 @@ async def help_command(message: types.Message):
 async def handle_create_quiz_button(message: types.Message):
     """Handle the Create Quiz button press"""
     user_id = message.from_user.id
-    user_states[user_id] = States.WAITING_FOR_FILE
-    
+    get_ctx(user_id).state = States.WAITING_FOR_FILE
+
     await message.answer(
         "📤 Please send me a PDF or text file with questions.\n\n"
         "The file should contain questions in this format:\n"
@@ -124,12 +210,19 @@ async def handle_create_quiz_button(message: types.Message):
 async def handle_extract_quizzes_button(message: types.Message):
     """Handle the Extract Quizzes button press"""
     user_id = message.from_user.id
-    user_states[user_id] = States.COLLECTING_FORWARDED_QUIZZES
-    
+    ctx = get_ctx(user_id)
+    ctx.state = States.COLLECTING_FORWARDED_QUIZZES
+
+    # Drop batches abandoned past their expiry so they don't accumulate
+    now = time.monotonic()
+    for other in user_contexts.values():
+        if other.batch and other.batch['expires_at'] < now:
+            other.batch = None
+
     # Initialize or clear the user's quiz batch
-    user_quiz_batches[user_id] = {
+    ctx.batch = {
         'quizzes': [],
-        'expires_at': datetime.now() + timedelta(hours=1)
+        'expires_at': now + _BATCH_TTL_SECONDS
     }
     
     await message.answer(
@@ -141,6 +234,7 @@ async def handle_extract_quizzes_button(message: types.Message):
 async def process_quiz_extraction(message: types.Message, text: str):
     """Helper function to process extracted text and send quizzes."""
     user_id = message.from_user.id
+    ctx = get_ctx(user_id)
     try:
         if not text.strip():
             await message.reply("❌ The provided text is empty.")
@@ -151,60 +245,68 @@ async def process_quiz_extraction(message: types.Message, text: str):
         # Reset the quiz counter for the user at the start of a new extraction
         quiz_counter[user_id] = 1
         
-        questions, skipped = extract_questions_from_text(text)
+        # CPU-bound regex parsing runs in a worker thread so the
+        # dispatcher keeps serving other updates meanwhile
+        questions, skipped = await asyncio.to_thread(extract_questions_from_text, text)
 
         if not questions:
             await message.reply(
                 "❌ No valid questions found. Please check the format and try again.",
                 reply_markup=get_main_keyboard(user_id)
             )
-            user_states[user_id] = States.IDLE
+            ctx.state = States.IDLE
             return
 
         # Store data for potential later use (e.g., showing questions as text)
-        if 'extracted_data' not in user_states:
-            user_states['extracted_data'] = {}
-        user_states['extracted_data'][user_id] = {
+        ctx.extracted = {
             'questions': questions,
             'skipped': skipped,
-            'timestamp': datetime.now()
+            'timestamp': time.monotonic()
         }
 
         sent, failed, failed_questions = await send_telegram_quizzes(
             message.bot, questions, message.chat.id, quiz_counter
         )
 
-        result_msg = f"✅ Successfully extracted {len(questions)} questions.\n"
-        result_msg += f"- Sent as quizzes: {sent}\n"
+        lines = [
+            f"✅ Successfully extracted {len(questions)} questions.",
+            f"- Sent as quizzes: {sent}",
+        ]
         if failed > 0:
-            result_msg += f"- Failed to send: {failed} (Numbers: {', '.join(map(str, failed_questions))})\n"
+            lines.append(f"- Failed to send: {failed} (Numbers: {', '.join(map(str, failed_questions))})")
         if skipped:
-            result_msg += f"\n⚠️ Skipped {len(skipped)} questions:\n"
-            for item in skipped[:5]:
-                result_msg += f"- Q#{item.get('number', '?')}: {item.get('reason', 'Unknown')}\n"
+            lines.append(f"\n⚠️ Skipped {len(skipped)} questions:")
+            lines.extend(
+                f"- Q#{item.get('number', '?')}: {item.get('reason', 'Unknown')}"
+                for item in skipped[:5]
+            )
             if len(skipped) > 5:
-                result_msg += f"...and {len(skipped) - 5} more."
+                lines.append(f"...and {len(skipped) - 5} more.")
+        result_msg = "\n".join(lines)
 
         await message.reply(result_msg, reply_markup=get_file_processing_keyboard())
-        user_states[user_id] = States.EXTRACTING_QUIZZES
+        ctx.state = States.EXTRACTING_QUIZZES
 
     except Exception as e:
         logger.error(f"Error during quiz extraction processing for user {user_id}: {e}", exc_info=True)
         await message.reply("❌ An unexpected error occurred while processing the questions.")
-        user_states[user_id] = States.IDLE
+        ctx.state = States.IDLE
 
 async def handle_file(message: types.Message):
     """Process PDF or text file."""
     user_id = message.from_user.id
-    if user_states.get(user_id) != States.WAITING_FOR_FILE:
+    ctx = get_ctx(user_id)
+    if ctx.state != States.WAITING_FOR_FILE:
         return
 
-    # Rate limiting
-    current_time = datetime.now().timestamp()
-    if user_id in user_last_file_time and (diff := current_time - user_last_file_time.get(user_id, 0)) < MIN_INTERVAL_BETWEEN_FILES:
-        await message.reply(f"⏳ Please wait {int(MIN_INTERVAL_BETWEEN_FILES - diff)} seconds.")
+    # Rate limiting via token bucket: one monotonic clock read per check,
+    # no datetime construction, and bursts are a capacity knob away
+    if ctx.file_bucket is None:
+        ctx.file_bucket = TokenBucket(capacity=1.0, rate=1.0 / MIN_INTERVAL_BETWEEN_FILES)
+    wait = ctx.file_bucket.acquire()
+    if wait > 0:
+        await message.reply(f"⏳ Please wait {int(wait)} seconds.")
         return
-    user_last_file_time[user_id] = current_time
 
     file_name = message.document.file_name.lower()
     if not (file_name.endswith('.pdf') or file_name.endswith('.txt')):
@@ -214,11 +316,10 @@ async def handle_file(message: types.Message):
     processing_msg = await message.reply("🔄 Processing file...")
     temp_path = None
     try:
-        file_stream = BytesIO()
-        await message.bot.download(message.document, destination=file_stream)
+        # Download straight to disk; no intermediate in-memory copy
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_name)[1]) as temp_file:
-            temp_file.write(file_stream.getvalue())
             temp_path = temp_file.name
+        await message.bot.download(message.document, destination=temp_path)
 
         text = await extract_text_from_file(temp_path)
         await process_quiz_extraction(message, text)
@@ -227,12 +328,9 @@ async def handle_file(message: types.Message):
         logger.error(f"File processing error for user {user_id}: {e}", exc_info=True)
         await message.reply("❌ Error processing the file.")
     finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-        try:
+        _unlink_quiet(temp_path)
+        with contextlib.suppress(Exception):
             await processing_msg.delete()
-        except Exception:
-            pass
 
 async def handle_quiz_message(message: types.Message):
     """
@@ -241,24 +339,25 @@ async def handle_quiz_message(message: types.Message):
     """
     try:
         user_id = message.from_user.id
-        
+        ctx = get_ctx(user_id)
+
         # Check if user is in the correct state to collect quizzes
-        if user_id not in user_states or user_states[user_id] != States.COLLECTING_FORWARDED_QUIZZES:
+        if ctx.state != States.COLLECTING_FORWARDED_QUIZZES:
             return
-            
+
         quiz = message.poll
-        
+
         # Initialize a new batch if one doesn't exist for the user
-        if user_id not in user_quiz_batches:
-            user_quiz_batches[user_id] = {
+        if ctx.batch is None:
+            ctx.batch = {
                 'quizzes': [],
-                'expires_at': datetime.now() + timedelta(hours=1)
+                'expires_at': time.monotonic() + _BATCH_TTL_SECONDS
             }
-        
+
         # Add the quiz to the user's batch
-        user_quiz_batches[user_id]['quizzes'].append(quiz)
-        
-        count = len(user_quiz_batches[user_id]['quizzes'])
+        ctx.batch['quizzes'].append(quiz)
+
+        count = len(ctx.batch['quizzes'])
         
         # Reply to the user with the current count and the keyboard
         await message.reply(
@@ -275,57 +374,63 @@ async def finish_extraction_callback(callback_query: types.CallbackQuery):
     """Handle finish extraction button press"""
     try:
         user_id = callback_query.from_user.id
-        
+        ctx = get_ctx(user_id)
+
         # Check if user has quizzes
-        if user_id not in user_quiz_batches or not user_quiz_batches[user_id]['quizzes']:
+        if ctx.batch is None or not ctx.batch['quizzes']:
             await callback_query.message.reply("❌ No quizzes saved")
             await callback_query.answer()
             return
 
         await callback_query.answer("Processing quizzes...")
-        
-        quizzes = user_quiz_batches.pop(user_id)['quizzes']
+
+        quizzes = ctx.batch['quizzes']
+        ctx.batch = None
         formatted_quizzes = []
         skipped_quizzes = []
-        
-        for i, quiz in enumerate(quizzes, 1):
-            try:
-                quiz_text = await format_quiz_as_text(quiz, i)
-                formatted_quizzes.append(quiz_text)
-            except Exception as e:
-                logger.error(f"Error formatting quiz {i}: {e}")
+
+        # Format all quizzes concurrently; ordering is preserved by gather
+        results = await asyncio.gather(
+            *(format_quiz_as_text(quiz, i) for i, quiz in enumerate(quizzes, 1)),
+            return_exceptions=True,
+        )
+        for i, result in enumerate(results, 1):
+            if isinstance(result, Exception):
+                logger.error(f"Error formatting quiz {i}: {result}")
                 skipped_quizzes.append(str(i))
+            else:
+                formatted_quizzes.append(result)
 
         # Create a summary message
         summary = f"✅ Extracted {len(formatted_quizzes)} quizzes out of {len(quizzes)} forwarded"
         if skipped_quizzes:
             summary += f"\n⚠️ Skipped questions: {', '.join(skipped_quizzes)}"
         
-        # Send as text message(s)
-        message_text = "\n\n".join(formatted_quizzes)
-        
+        # Size check on the parts themselves, before any join
+        total_len = sum(len(q) for q in formatted_quizzes) + 2 * max(len(formatted_quizzes) - 1, 0)
+
         # Split if too long
-        if len(message_text) > 4000:
-            # Save to file and send as document
+        if total_len > 4000:
+            # Save to file and send as document; the joined string is
+            # never materialized on this path
             file_path = get_temp_file_path(user_id)
-            if save_questions_to_file(formatted_quizzes, file_path):
+            if await asyncio.to_thread(save_questions_to_file, formatted_quizzes, file_path):
                 await callback_query.message.reply_document(
                     FSInputFile(file_path, filename="extracted_quizzes.txt"),
                     caption=summary
                 )
                 # Clean up the file
-                os.remove(file_path)
+                await asyncio.to_thread(_unlink_quiet, file_path)
             else:
                 # If file saving fails, send in parts
-                parts = [message_text[i:i+4000] for i in range(0, len(message_text), 4000)]
+                parts = _split_into_parts(formatted_quizzes)
                 await callback_query.message.reply(summary)
-                for i, part in enumerate(parts, 1):
-                    await callback_query.message.reply(f"Part {i}/{len(parts)}:\n\n{part}")
+                await _reply_in_parts(callback_query.message, parts)
         else:
-            await callback_query.message.reply(f"{summary}\n\n{message_text}")
-        
+            await callback_query.message.reply(f"{summary}\n\n" + "\n\n".join(formatted_quizzes))
+
         # Reset user state
-        user_states[user_id] = States.IDLE
+        ctx.state = States.IDLE
 
     except Exception as e:
         logger.error(f"Quiz extraction error: {e}", exc_info=True)
@@ -335,55 +440,55 @@ async def show_questions_callback(callback_query: types.CallbackQuery):
     """Handle show extracted questions button press"""
     try:
         user_id = callback_query.from_user.id
-        
+        ctx = get_ctx(user_id)
+
         # Check if user has extracted data
-        if 'extracted_data' not in user_states or user_id not in user_states['extracted_data']:
+        if ctx.extracted is None:
             await callback_query.message.reply("❌ No extracted questions available")
             await callback_query.answer()
             return
 
         await callback_query.answer("Showing extracted questions...")
+
+        questions = ctx.extracted['questions']
+        skipped = ctx.extracted['skipped']
         
-        extracted_data = user_states['extracted_data'][user_id]
-        questions = extracted_data['questions']
-        skipped = extracted_data['skipped']
-        
-        # Format questions as text
+        # Format questions as text: one join for the options and one
+        # f-string per question
         formatted_questions = []
         for i, q in enumerate(questions, 1):
-            question_text = f"{i}. {q['question']}\n"
-            for j, option in enumerate(q['options']):
-                question_text += f"{chr(97 + j)}) {option}\n"
-            correct_letter = chr(97 + q['correct_option_id'])
-            question_text += f"Answer: {correct_letter}) {q['options'][q['correct_option_id']]}"
-            formatted_questions.append(question_text)
+            opts = "\n".join(f"{_LETTERS[j]}) {option}" for j, option in enumerate(q['options']))
+            correct_id = q['correct_option_id']
+            formatted_questions.append(
+                f"{i}. {q['question']}\n{opts}\nAnswer: {_LETTERS[correct_id]}) {q['options'][correct_id]}"
+            )
         
         # Create summary message
         summary = f"📊 Showing {len(questions)} extracted questions"
         if skipped:
             summary += f"\n⚠️ {len(skipped)} questions were skipped due to format issues"
         
-        # Send as text or file depending on length
-        message_text = "\n\n".join(formatted_questions)
-        
-        if len(message_text) > 4000:
+        # Send as text or file depending on length; sizing uses the parts
+        # so the join only happens on the short path
+        total_len = sum(len(q) for q in formatted_questions) + 2 * max(len(formatted_questions) - 1, 0)
+
+        if total_len > 4000:
             # Save to file and send as document
             file_path = get_temp_file_path(user_id, prefix="extracted_")
-            if save_questions_to_file(formatted_questions, file_path):
+            if await asyncio.to_thread(save_questions_to_file, formatted_questions, file_path):
                 await callback_query.message.reply_document(
                     FSInputFile(file_path, filename="extracted_questions.txt"),
                     caption=summary
                 )
                 # Clean up the file
-                os.remove(file_path)
+                await asyncio.to_thread(_unlink_quiet, file_path)
             else:
                 # If file saving fails, send in parts
-                parts = [message_text[i:i+4000] for i in range(0, len(message_text), 4000)]
+                parts = _split_into_parts(formatted_questions)
                 await callback_query.message.reply(summary)
-                for i, part in enumerate(parts, 1):
-                    await callback_query.message.reply(f"Part {i}/{len(parts)}:\n\n{part}")
+                await _reply_in_parts(callback_query.message, parts)
         else:
-            await callback_query.message.reply(f"{summary}\n\n{message_text}")
+            await callback_query.message.reply(f"{summary}\n\n" + "\n\n".join(formatted_questions))
     
     except Exception as e:
         logger.error(f"Show questions error: {e}", exc_info=True)
@@ -392,28 +497,24 @@ async def show_questions_callback(callback_query: types.CallbackQuery):
 async def cancel_extraction_callback(callback_query: types.CallbackQuery):
     """Handle cancel extraction button press"""
     user_id = callback_query.from_user.id
-    
-    # Clear user data
-    if user_id in user_quiz_batches:
-        del user_quiz_batches[user_id]
-    
-    # Reset user state
-    user_states[user_id] = States.IDLE
-    
+    ctx = get_ctx(user_id)
+
+    # Clear user data and reset state
+    ctx.batch = None
+    ctx.state = States.IDLE
+
     await callback_query.answer("Extraction cancelled")
     await callback_query.message.reply("❌ Quiz extraction cancelled", reply_markup=get_main_keyboard(user_id))
 
 async def cancel_processing_callback(callback_query: types.CallbackQuery):
     """Handle cancel processing button press"""
     user_id = callback_query.from_user.id
-    
-    # Clear user data if exists
-    if 'extracted_data' in user_states and user_id in user_states['extracted_data']:
-        del user_states['extracted_data'][user_id]
-    
-    # Reset user state
-    user_states[user_id] = States.IDLE
-    
+    ctx = get_ctx(user_id)
+
+    # Clear user data and reset state
+    ctx.extracted = None
+    ctx.state = States.IDLE
+
     await callback_query.answer("Processing cancelled")
     await callback_query.message.reply("❌ Processing cancelled", reply_markup=get_main_keyboard(user_id))
 
@@ -422,36 +523,38 @@ async def handle_admin_panel_button(message: types.Message):
     """Handle the Admin Panel button press."""
     user_id = message.from_user.id
     if user_id in ADMIN_IDS:
-        user_states[user_id] = States.ADMIN_PANEL
+        get_ctx(user_id).state = States.ADMIN_PANEL
         await message.answer("👑 Welcome to the Admin Panel!", reply_markup=get_admin_keyboard())
 
 
+# Button-text dispatch table: one hash lookup per message instead of a
+# chain of string comparisons
+_BUTTON_HANDLERS = {
+    "📝 Create Quiz": handle_create_quiz_button,
+    "📥 Extract Quizzes from Forwards": handle_extract_quizzes_button,
+    "❓ Help": help_command,
+    "👑 Admin Panel": handle_admin_panel_button,
+}
+
 async def handle_text_message(message: types.Message):
     """Handle text messages for button presses or direct quiz text."""
     user_id = message.from_user.id
     text = message.text
 
     # Check for button presses first
-    if text == "📝 Create Quiz":
-        await handle_create_quiz_button(message)
-        return
-    elif text == "📥 Extract Quizzes from Forwards":
-        await handle_extract_quizzes_button(message)
-        return
-    elif text == "❓ Help":
-        await help_command(message)
-        return
-    elif text == "👑 Admin Panel":
-        await handle_admin_panel_button(message)
+    button_handler = _BUTTON_HANDLERS.get(text)
+    if button_handler is not None:
+        await button_handler(message)
         return
 
     # Route to admin handler if in admin panel
-    if user_states.get(user_id) == States.ADMIN_PANEL:
+    ctx = get_ctx(user_id)
+    if ctx.state == States.ADMIN_PANEL:
         await handle_admin_text_message(message)
         return
 
     # If not a button, check if user is in a state to send quiz text
-    if user_states.get(user_id) == States.WAITING_FOR_FILE:
+    if ctx.state == States.WAITING_FOR_FILE:
         processing_msg = await message.reply("🔄 Processing text...")
         await process_quiz_extraction(message, text)
         await processing_msg.delete()
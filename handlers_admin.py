@@ -4,7 +4,7 @@ from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from filedb import is_user_allowed, add_allowed_user_from_user, list_allowed_users, list_all_users, get_user_by_id, remove_allowed_user
 from config import ADMIN_IDS
 from keyboards import get_main_keyboard
-from states import user_states, States
+from states import get_ctx, States
 
 
 async def allow_user_command(message: types.Message, command: CommandObject):
@@ -24,7 +24,7 @@ async def allow_user_command(message: types.Message, command: CommandObject):
     if not user:
         await message.reply(f"User <code>{user_id}</code> is not in the users list. They must send /start first.", parse_mode="HTML")
         return
-    if add_allowed_user_from_user(user):
+    if await add_allowed_user_from_user(user):
         await message.reply(f"User <code>{user_id}</code> (<b>{user['first_name']}</b>) promoted to allowed users.", parse_mode="HTML")
     else:
         await message.reply("Failed to add user to allowed_users.")
@@ -39,7 +39,7 @@ async def removeuser_command(message: types.Message, command: CommandObject):
         await message.reply("Usage: /removeuser <user_id>")
         return
     user_id = int(command.args.strip())
-    if remove_allowed_user(user_id):
+    if await remove_allowed_user(user_id):
         await message.reply(f"User {user_id} removed.")
     else:
         await message.reply("Failed to remove user.")
@@ -72,24 +72,34 @@ async def userlist_command(message: types.Message):
     ])
     await message.reply(msg, parse_mode="HTML")
 
+async def _prompt_allow_user(message: types.Message):
+    await message.reply("Please use the command: /allow_user <user_id>")
+
+async def _prompt_remove_user(message: types.Message):
+    await message.reply("Please use the command: /removeuser <user_id>")
+
+async def _back_to_main_menu(message: types.Message):
+    user_id = message.from_user.id
+    get_ctx(user_id).state = States.IDLE
+    await message.answer("Returning to the main menu.", reply_markup=get_main_keyboard(user_id))
+
+# Admin button dispatch table: one hash lookup instead of an elif chain
+_ADMIN_BUTTON_HANDLERS = {
+    "📋 List Allowed Users": listusers_command,
+    "👥 List All Users": userlist_command,
+    "✅ Allow User": _prompt_allow_user,
+    "❌ Remove User": _prompt_remove_user,
+    "⬅️ Back to Main Menu": _back_to_main_menu,
+}
+
 async def handle_admin_text_message(message: types.Message):
     """Handle text messages for admin panel button presses."""
-    user_id = message.from_user.id
-    if user_id not in ADMIN_IDS:
+    if message.from_user.id not in ADMIN_IDS:
         return  # Should not happen if they see the buttons
 
-    text = message.text
-    if text == "📋 List Allowed Users":
-        await listusers_command(message)
-    elif text == "👥 List All Users":
-        await userlist_command(message)
-    elif text == "✅ Allow User":
-        await message.reply("Please use the command: /allow_user <user_id>")
-    elif text == "❌ Remove User":
-        await message.reply("Please use the command: /removeuser <user_id>")
-    elif text == "⬅️ Back to Main Menu":
-        user_states[user_id] = States.IDLE
-        await message.answer("Returning to the main menu.", reply_markup=get_main_keyboard(user_id))
+    handler = _ADMIN_BUTTON_HANDLERS.get(message.text)
+    if handler is not None:
+        await handler(message)
 
 
 async def myaccess_command(message: types.Message):
@@ -104,11 +114,15 @@ async def myaccess_command(message: types.Message):
 
 from aiogram.dispatcher.middlewares.base import BaseMiddleware
 
+# Commands that bypass the access check; hoisted so the middleware does
+# not rebuild the tuple on every update
+_FREE_COMMANDS = ('/start', '/help', '/allow_user', '/removeuser', '/listusers', '/userlist', '/myaccess')
+
 class AccessControlMiddleware(BaseMiddleware):
     async def __call__(self, handler, event, data):
         # Allow /start, /help, and admin commands without restriction
-        if hasattr(event, 'text') and event.text and event.text.startswith((
-            '/start', '/help', '/allow_user', '/removeuser', '/listusers')):
+        text = getattr(event, 'text', None)
+        if text and text.startswith(_FREE_COMMANDS):
             return await handler(event, data)
 
         # Always allow admin
@@ -119,5 +133,5 @@ class AccessControlMiddleware(BaseMiddleware):
         # Check DB-based access for non-admins
         if user_id and is_user_allowed(user_id):
             return await handler(event, data)
-            
+
         await event.reply("❌ You are not authorized to use this bot.")
@@ -1,34 +1,41 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from config import ADMIN_IDS
 
-def get_main_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Create the main keyboard, adding admin buttons if applicable."""
-    keyboard_buttons = [
-        [KeyboardButton(text="📝 Create Quiz")],
-        [KeyboardButton(text="📥 Extract Quizzes from Forwards")],
-        [KeyboardButton(text="❓ Help")]
-    ]
+# Keyboards are immutable, so build each variant once at import time
+# instead of re-running pydantic validation on every call.
+
+_USER_BUTTONS = [
+    [KeyboardButton(text="📝 Create Quiz")],
+    [KeyboardButton(text="📥 Extract Quizzes from Forwards")],
+    [KeyboardButton(text="❓ Help")]
+]
+
+_MAIN_KEYBOARD_USER = ReplyKeyboardMarkup(
+    keyboard=_USER_BUTTONS,
+    resize_keyboard=True,
+    one_time_keyboard=False
+)
 
-    # Add admin button if the user is an admin
-    if user_id in ADMIN_IDS:
-        keyboard_buttons.append([KeyboardButton(text="👑 Admin Panel")])
+_MAIN_KEYBOARD_ADMIN = ReplyKeyboardMarkup(
+    keyboard=_USER_BUTTONS + [[KeyboardButton(text="👑 Admin Panel")]],
+    resize_keyboard=True,
+    one_time_keyboard=False
+)
 
-    keyboard = ReplyKeyboardMarkup(
-        keyboard=keyboard_buttons,
-        resize_keyboard=True,
-        one_time_keyboard=False
-    )
-    return keyboard
+_ADMIN_KEYBOARD = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="📋 List Allowed Users"), KeyboardButton(text="👥 List All Users")],
+        [KeyboardButton(text="✅ Allow User"), KeyboardButton(text="❌ Remove User")],
+        [KeyboardButton(text="⬅️ Back to Main Menu")]
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=False
+)
+
+def get_main_keyboard(user_id: int) -> ReplyKeyboardMarkup:
+    """Return the main keyboard, with admin buttons if applicable."""
+    return _MAIN_KEYBOARD_ADMIN if user_id in ADMIN_IDS else _MAIN_KEYBOARD_USER
 
 def get_admin_keyboard() -> ReplyKeyboardMarkup:
-    """Create the admin panel keyboard."""
-    keyboard = ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="📋 List Allowed Users"), KeyboardButton(text="👥 List All Users")],
-            [KeyboardButton(text="✅ Allow User"), KeyboardButton(text="❌ Remove User")],
-            [KeyboardButton(text="⬅️ Back to Main Menu")]
-        ],
-        resize_keyboard=True,
-        one_time_keyboard=False
-    )
-    return keyboard
+    """Return the shared admin panel keyboard."""
+    return _ADMIN_KEYBOARD
@@ -2,24 +2,27 @@ import asyncio
 import logging
 import signal
 import os
-from aiogram import Bot, Dispatcher
+from weakref import WeakSet
+from aiogram import Bot, Dispatcher, F
 from aiogram.enums import ParseMode
 from aiogram.filters import Command, CommandStart
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.types import BotCommand
 
 from config import TELEGRAM_TOKEN, LOG_CHANNEL_ID
 from filedb import load_allowed_users_cache
 from handlers import (
-    start_command, 
-    help_command, 
-    handle_file, 
+    start_command,
+    help_command,
+    handle_file,
     handle_quiz_message,
     finish_extraction_callback,
     cancel_extraction_callback,
     show_questions_callback,
     cancel_processing_callback,
-    handle_text_message
+    handle_text_message,
+    session_janitor
 )
 from handlers_admin import (
     allow_user_command,
@@ -33,37 +36,65 @@ from handlers_admin import (
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Background tasks we spawned ourselves; shutdown cancels only these
+# instead of sweeping asyncio.all_tasks() and hitting aiogram internals
+_OUR_TASKS: "WeakSet[asyncio.Task]" = WeakSet()
+
+def spawn(coro) -> asyncio.Task:
+    """create_task wrapper that records the task for targeted shutdown."""
+    task = asyncio.create_task(coro)
+    _OUR_TASKS.add(task)
+    return task
+
 # Create temp directory if it doesn't exist
 os.makedirs("temp", exist_ok=True)
 
+# Use orjson for Bot API payloads when available; every update and
+# send_poll goes through this codec
+try:
+    import orjson
+    session = AiohttpSession(
+        json_loads=orjson.loads,
+        json_dumps=lambda obj: orjson.dumps(obj).decode(),
+    )
+except ImportError:
+    session = AiohttpSession()
+
+# Tune the TCP connector: a larger keepalive pool and cached DNS remove
+# the per-request handshake cost when quizzes are sent in bursts
+session._connector_init.update(limit=50, ttl_dns_cache=300, keepalive_timeout=75)
+
 # Initialize bot with default properties
 bot = Bot(
     token=TELEGRAM_TOKEN,
+    session=session,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
 dp = Dispatcher()
 
 
-# Register command handlers
+# Register command handlers first: exact string matches are the cheapest
+# and most selective checks in the dispatch walk
 dp.message.register(start_command, CommandStart())
 dp.message.register(help_command, Command("help"))
-
-# Register message handlers
-dp.message.register(handle_file, lambda m: m.document)
-dp.message.register(handle_quiz_message, lambda m: m.poll and m.poll.type == 'quiz')
-dp.message.register(handle_text_message, lambda m: m.text and not m.text.startswith('/'))
 dp.message.register(allow_user_command, Command("allow_user"))
 dp.message.register(removeuser_command, Command("removeuser"))
 dp.message.register(listusers_command, Command("listusers"))
 dp.message.register(myaccess_command, Command("myaccess"))
 dp.message.register(userlist_command, Command("userlist"))
+
+# Register message handlers with magic filters, which aiogram evaluates
+# without a Python closure frame per update
+dp.message.register(handle_file, F.document)
+dp.message.register(handle_quiz_message, F.poll.type == 'quiz')
+dp.message.register(handle_text_message, F.text, ~F.text.startswith('/'))
 dp.message.middleware(AccessControlMiddleware())
 
 # Register callback query handlers
-dp.callback_query.register(finish_extraction_callback, lambda c: c.data == "finish_extraction")
-dp.callback_query.register(cancel_extraction_callback, lambda c: c.data == "cancel_extraction")
-dp.callback_query.register(show_questions_callback, lambda c: c.data == "show_questions")
-dp.callback_query.register(cancel_processing_callback, lambda c: c.data == "cancel_processing")
+dp.callback_query.register(finish_extraction_callback, F.data == "finish_extraction")
+dp.callback_query.register(cancel_extraction_callback, F.data == "cancel_extraction")
+dp.callback_query.register(show_questions_callback, F.data == "show_questions")
+dp.callback_query.register(cancel_processing_callback, F.data == "cancel_processing")
 
 # Enhanced error handler
 @dp.error()
@@ -99,6 +130,9 @@ async def main():
     # Load the allowed users cache
     load_allowed_users_cache()
 
+    # Reap abandoned sessions in the background
+    janitor_task = spawn(session_janitor())
+
     # Set bot commands
     await set_commands(bot)
     
@@ -113,18 +147,27 @@ async def main():
 async def shutdown(signal, loop):
     """Safely shutdown the bot when receiving termination signal"""
     logger.warning(f"Received {signal.name} signal...")
-    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
-    
+    tasks = [t for t in _OUR_TASKS if not t.done()]
+
     if tasks:
-        logger.info(f"Cancelling {len(tasks)} pending tasks...")
+        logger.info(f"Cancelling {len(tasks)} background tasks...")
         for task in tasks:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
-        
+
+    # Let aiogram wind down polling itself instead of cancelling its
+    # internal tasks out from under it
+    await dp.stop_polling()
     logger.info("Bot shutdown successful!")
-    loop.stop()
 
 if __name__ == "__main__":
+    # Prefer uvloop's libuv-based loop; not available on Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
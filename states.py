@@ -1,5 +1,7 @@
 # User states
-user_states = {}
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
 
 # Define state constants
 class States:
@@ -8,3 +10,46 @@ class States:
     EXTRACTING_QUIZZES = "extracting_quizzes"
     COLLECTING_FORWARDED_QUIZZES = "collecting_forwarded_quizzes"
     ADMIN_PANEL = "admin_panel"
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token-bucket rate limiter on the monotonic clock.
+
+    Refills at `rate` tokens/second up to `capacity`, so raising the
+    capacity allows short bursts without changing the sustained rate.
+    """
+    capacity: float
+    rate: float
+    tokens: float = 0.0
+    last: float = 0.0
+
+    def acquire(self) -> float:
+        """Take a token; returns 0.0 on success, else seconds to wait."""
+        now = time.monotonic()
+        if self.last == 0.0:
+            self.tokens = self.capacity  # full bucket on first use
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+@dataclass(slots=True)
+class UserCtx:
+    """All per-user session state in one object, one dict lookup away."""
+    state: str = States.IDLE
+    file_bucket: Optional[TokenBucket] = None
+    batch: Optional[dict] = None      # {'quizzes': [...], 'expires_at': monotonic float}
+    extracted: Optional[dict] = None  # {'questions': [...], 'skipped': [...], 'timestamp': ...}
+
+user_contexts: Dict[int, UserCtx] = {}
+
+def get_ctx(user_id: int) -> UserCtx:
+    """Return the user's context, creating it on first sight."""
+    ctx = user_contexts.get(user_id)
+    if ctx is None:
+        ctx = UserCtx()
+        user_contexts[user_id] = ctx
+    return ctx
@@ -2,14 +2,96 @@ import logging
 import fitz
 import re
 import asyncio
+import hashlib
 import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from typing import List, Dict, Set, Any, Tuple, Optional, Union
 from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.types import Poll, Message, FSInputFile
 
+from states import TokenBucket
+
 logger = logging.getLogger(__name__)
 
+# Ensure the temp directory exists once at import instead of re-checking
+# on every get_temp_file_path call
+os.makedirs("temp", exist_ok=True)
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"  # Option letter lookup for formatting
+_LETTER_PREFIX = [f"{c}) " for c in _LETTERS]  # "a) ", "b) ", ...
+
+try:
+    import re2 as _re_fast  # google-re2: linear-time matching, no ReDoS
+except ImportError:
+    _re_fast = None
+
+def _compile_fast(pattern: str):
+    """Compile with google-re2 when it can handle the pattern, else re.
+
+    re2 rejects lookahead, so the block/question tokenizers stay on the
+    stdlib engine; the simpler hot patterns get native linear-time
+    matching when the optional dependency is installed.
+    """
+    if _re_fast is not None:
+        try:
+            return _re_fast.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+# Compiled once at import; extract_questions_from_text runs these per block,
+# so inline re.* calls would pay a cache lookup on every iteration.
+# One combined pattern tokenizes the document in a single pass: it anchors
+# on a line-initial question number and captures everything up to the next
+# number (or EOF) as the block body.
+_QBLOCK_RE = re.compile(
+    r'(?:^|\n)\s*(?:Q\s*)?(\d+)\s*[.\-)]\s*(.*?)(?=\n\s*(?:Q\s*)?\d+\s*[.\-)]|\Z)',
+    re.DOTALL,
+)
+_Q_TEXT_RE = re.compile(r'(.*?)(?=\n\s*[a-zA-Z][.)])', re.DOTALL)
+_ANSWER_RE = _compile_fast(r'(?i)Answer\s*:\s*([a-zA-Z])')
+_OPT_DELIM_RE = re.compile(r'\n\s*([a-zA-Z])[.)][ \t]*')
+# Fold embedded newlines to spaces in one translate pass
+_NL_TABLE = str.maketrans({'\n': ' '})
+_LEADING_NUM_RE = _compile_fast(r'^\d+\s*[.)]\s*')
+
+# One fused pattern for page cleanup: run consolidation and blank-line
+# collapsing happen in a single scan instead of two re.sub passes.
+_WS_RE = re.compile(r' +|\n\s*\n')
+
+def _ws_repl(m: "re.Match") -> str:
+    return ' ' if m.group(0)[0] == ' ' else '\n\n'
+
+# Worker processes spawn lazily on first submit, so idle bots pay nothing.
+_PDF_POOL = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4))
+# Below this page count the fork/pickle overhead outweighs the speedup.
+_PARALLEL_PAGE_THRESHOLD = 8
+
+# Plain-text extraction doesn't need ligature or image bookkeeping, so
+# drop those from the default flag set to save MuPDF-side allocations.
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES & ~fitz.TEXT_PRESERVE_IMAGES
+
+def _extract_pages_worker(pdf_path: str, page_indices: List[int]) -> str:
+    """Extract and clean a subset of pages; picklable, runs in a pool process."""
+    parts = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_indices:
+            try:
+                page = doc[page_num]
+                # A page without fonts is image-only (scanned); checking the
+                # resource dict is far cheaper than a full text traversal
+                if not page.get_fonts(full=False):
+                    continue
+                parts.append(_WS_RE.sub(_ws_repl, page.get_text("text", flags=_TEXT_FLAGS)))
+                parts.append("\n\n")
+            except Exception as e:
+                logger.error(f"Error extracting text from page {page_num+1}: {str(e)}")
+    return "".join(parts)
+
 async def extract_text_from_pdf(pdf_path: str) -> str:
     """
     Extract text from PDF file with optimized formatting preservation.
@@ -20,31 +102,41 @@ async def extract_text_from_pdf(pdf_path: str) -> str:
     Returns:
         Extracted text with preserved formatting
     """
-    text = ""
     try:
         with fitz.open(pdf_path) as doc:
             page_count = len(doc)
-            if page_count == 0:
-                logger.warning("PDF is empty: no pages found")
-                return ""
-                
-            logger.info(f"Processing PDF with {page_count} pages")
-            
-            for page_num, page in enumerate(doc):
-                try:
-                    # Get text with better formatting
-                    page_text = page.get_text("text")
-                    # Clean up excessive whitespace while preserving format
-                    page_text = re.sub(r' +', ' ', page_text)
-                    page_text = re.sub(r'\n\s*\n', '\n\n', page_text)
-                    
-                    text += page_text + "\n\n"
-                except Exception as e:
-                    logger.error(f"Error extracting text from page {page_num+1}: {str(e)}")
     except Exception as e:
         logger.error(f"Error opening PDF file: {str(e)}")
-    
-    return text
+        return ""
+
+    if page_count == 0:
+        logger.warning("PDF is empty: no pages found")
+        return ""
+
+    logger.info(f"Processing PDF with {page_count} pages")
+
+    # Small files stay in-process: fork/pickle overhead beats the speedup
+    if page_count < _PARALLEL_PAGE_THRESHOLD:
+        return await asyncio.to_thread(_extract_pages_worker, pdf_path, list(range(page_count)))
+
+    # Split pages into contiguous chunks, one per pool worker; each worker
+    # reopens the PDF itself since fitz documents don't pickle
+    workers = _PDF_POOL._max_workers
+    step = -(-page_count // workers)  # ceil division
+    chunks = [list(range(s, min(s + step, page_count))) for s in range(0, page_count, step)]
+    loop = asyncio.get_running_loop()
+    try:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(_PDF_POOL, _extract_pages_worker, pdf_path, chunk) for chunk in chunks)
+        )
+    except Exception as e:
+        logger.error(f"Process-pool extraction failed, falling back inline: {e}")
+        return await asyncio.to_thread(_extract_pages_worker, pdf_path, list(range(page_count)))
+    return "".join(results)
+
+def _read_text_file(file_path: str) -> str:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 async def extract_text_from_file(file_path: str) -> str:
     """
@@ -60,13 +152,101 @@ async def extract_text_from_file(file_path: str) -> str:
         if file_path.lower().endswith('.pdf'):
             return await extract_text_from_pdf(file_path)
         else:
-            # Assume it's a text file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            # Assume it's a text file; read it in a worker thread so a
+            # large upload doesn't stall the event loop
+            return await asyncio.to_thread(_read_text_file, file_path)
     except Exception as e:
         logger.error(f"Error extracting text from file: {str(e)}", exc_info=True)
         return ""
 
+class _SkipQuestion(Exception):
+    """Raised by _parse_block when a block cannot become a quiz question."""
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+def _parse_block(block: str, question_num: str, seen_question_keys: Set[int]) -> Dict[str, Any]:
+    """Parse one tokenized block into a question dict.
+
+    Raises:
+        _SkipQuestion: with the user-facing reason when the block is unusable.
+    """
+    # Cheap pre-filter: without an answer marker the block can never
+    # parse, so one C-level substring scan replaces all regex work
+    if 'answer' not in block.lower():
+        logger.warning(f"Skipping Q#{question_num}: No answer line found.")
+        raise _SkipQuestion('No answer line found.')
+
+    # 1. Extract Question Text (up to the first option)
+    q_match = _Q_TEXT_RE.match(block)
+    if not q_match:
+        logger.warning(f"Skipping Q#{question_num}: No question pattern matched. Content: {block[:200]}...")
+        raise _SkipQuestion('Could not find question number or text.')
+
+    question_text = q_match.group(1).translate(_NL_TABLE).strip()
+
+    if not question_text:
+        raise _SkipQuestion('Empty question text.')
+
+    # The key is only recorded after full validation (below), so a
+    # malformed early copy can't shadow a later well-formed duplicate
+    question_key = zlib.crc32(question_text.encode('utf-8'))
+    if question_key in seen_question_keys:
+        raise _SkipQuestion('Duplicate question.')
+
+    # 2. Extract Answer (must exist)
+    answer_match = _ANSWER_RE.search(block)
+    if not answer_match:
+        logger.warning(f"Skipping Q#{question_num}: No answer line found.")
+        raise _SkipQuestion('No answer line found.')
+    correct_letter = answer_match.group(1).lower()
+
+    # 3. Extract Options: one delimiter scan up to the answer line,
+    # slicing option text between consecutive delimiter offsets
+    option_marks = list(_OPT_DELIM_RE.finditer(block, 0, answer_match.start()))
+    if not option_marks:
+        logger.warning(f"Skipping Q#{question_num}: Could not find options block before answer.")
+        raise _SkipQuestion('No options found.')
+
+    if len(option_marks) < 2:
+        logger.warning(f"Skipping Q#{question_num}: Found only {len(option_marks)} options.")
+        raise _SkipQuestion(f'Found only {len(option_marks)} options.')
+
+    # 4. Process and Validate
+    options = []
+    option_letters = []
+    for j, mark in enumerate(option_marks):
+        end = option_marks[j + 1].start() if j + 1 < len(option_marks) else answer_match.start()
+        options.append(block[mark.end():end].translate(_NL_TABLE).strip())
+        option_letters.append(mark.group(1).lower())
+
+    try:
+        correct_index = option_letters.index(correct_letter)
+    except ValueError:
+        logger.warning(f"Skipping Q#{question_num}: Correct answer letter '{correct_letter}' not in options {option_letters}.")
+        raise _SkipQuestion(f'Correct answer letter "{correct_letter}" not in options {option_letters}.')
+
+    seen_question_keys.add(question_key)
+    return {
+        'question_num': question_num,
+        'question': question_text,
+        'options': options,
+        'correct_option_id': correct_index
+    }
+
+# Re-uploads of the same file are common (retries, testing); remember
+# recent parses by content hash so they cost a dict lookup, not a reparse.
+_PARSE_CACHE: Dict[bytes, Tuple[List[Dict[str, Any]], List[Dict[str, str]]]] = {}
+_PARSE_CACHE_MAX = 32
+
+def _copy_parse_result(result: Tuple[List[Dict[str, Any]], List[Dict[str, str]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Copy the cached lists, dicts, and nested options so callers can't mutate the cache."""
+    questions, skipped = result
+    return (
+        [{**q, 'options': list(q['options'])} for q in questions],
+        [dict(s) for s in skipped],
+    )
+
 def extract_questions_from_text(text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
     """Extract questions and answers from text using a robust, multi-stage approach.
 
@@ -78,93 +258,99 @@ def extract_questions_from_text(text: str) -> Tuple[List[Dict[str, Any]], List[D
         - A list of successfully parsed question dictionaries.
         - A list of dictionaries for skipped questions, including the reason for skipping.
     """
-    text = text.replace('\r\n', '\n').strip()
+    cache_key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    cached = _PARSE_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info("Returning cached parse for previously seen text.")
+        return _copy_parse_result(cached)
+
+    # Only copy when there's actually a CR; Unix-produced text skips the O(N) pass
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    text = text.strip()
     logger.info(f"Total length of extracted text: {len(text)} characters")
 
     questions = []
     skipped_questions = []
-    extracted_question_texts = set()
-
-    # Split text into blocks based on question numbering. This is more reliable.
-    question_blocks = re.split(r'\n(?=\s*(?:Q\s*)?\d+\s*[.\-)])', text)
-    logger.info(f"Found {len(question_blocks)} potential question blocks.")
+    # Dedup on crc32 of the question text: int membership tests instead of
+    # hashing multi-KB strings; collision risk is negligible within one file
+    seen_question_keys: Set[int] = set()
 
-    for i, block in enumerate(question_blocks):
-        block = block.strip()
-        if not block:
-            continue
+    # Tokenize into blocks anchored on question numbering in one pass;
+    # _parse_block does the work and signals failures with _SkipQuestion,
+    # leaving this loop with a single append site per outcome
+    for i, m in enumerate(_QBLOCK_RE.finditer(text), 1):
+        question_num = m.group(1)
+        block = m.group(2)
 
         try:
-            # 1. Extract Question Number and Text (up to the first option)
-            q_match = re.match(r'(?:Q\s*)?(\d+)\s*[.\-)]\s*(.*?)(?=\n\s*[a-zA-Z][.)])', block, re.DOTALL)
-            if not q_match:
-                logger.warning(f"Skipping block {i+1}: No question pattern matched. Content: {block[:200]}...")
-                skipped_questions.append({'number': f'Block {i+1}', 'reason': 'Could not find question number or text.'})
-                continue
-
-            question_num = q_match.group(1)
-            question_text = q_match.group(2).strip().replace('\n', ' ')
-
-            if not question_text:
-                skipped_questions.append({'number': question_num, 'reason': 'Empty question text.'})
-                continue
-
-            if question_text in extracted_question_texts:
-                skipped_questions.append({'number': question_num, 'reason': 'Duplicate question.'})
-                continue
-
-            # 2. Extract Answer (must exist)
-            answer_match = re.search(r'Answer\s*:\s*([a-zA-Z])', block, re.IGNORECASE)
-            if not answer_match:
-                logger.warning(f"Skipping Q#{question_num}: No answer line found.")
-                skipped_questions.append({'number': question_num, 'reason': 'No answer line found.'})
-                continue
-            correct_letter = answer_match.group(1).lower()
-
-            # 3. Extract Options (from first option to just before the answer line)
-            options_part_match = re.search(r'((?:\n\s*[a-zA-Z][.)].*?)+)(?=\n\s*Answer\s*:)', block, re.DOTALL)
-            if not options_part_match:
-                logger.warning(f"Skipping Q#{question_num}: Could not find options block before answer.")
-                skipped_questions.append({'number': question_num, 'reason': 'No options found.'})
-                continue
-            
-            options_text = options_part_match.group(1)
-            option_matches = re.findall(r'\n\s*([a-zA-Z])[.)]\s*(.*?)(?=\n\s*[a-zA-Z][.)]|$)', options_text, re.DOTALL)
-
-            if len(option_matches) < 2:
-                logger.warning(f"Skipping Q#{question_num}: Found only {len(option_matches)} options.")
-                skipped_questions.append({'number': question_num, 'reason': f'Found only {len(option_matches)} options.'})
-                continue
-
-            # 4. Process and Validate
-            options = [opt[1].strip().replace('\n', ' ') for opt in option_matches]
-            option_letters = [opt[0].lower() for opt in option_matches]
-            
-            try:
-                correct_index = option_letters.index(correct_letter)
-            except ValueError:
-                logger.warning(f"Skipping Q#{question_num}: Correct answer letter '{correct_letter}' not in options {option_letters}.")
-                skipped_questions.append({'number': question_num, 'reason': f'Correct answer letter "{correct_letter}" not in options {option_letters}.'})
-                continue
-
-            questions.append({
-                'question_num': question_num,
-                'question': question_text,
-                'options': options,
-                'correct_option_id': correct_index
-            })
-            extracted_question_texts.add(question_text)
-            logger.info(f"Successfully parsed question {question_num}: {question_text[:60]}...")
-
+            question = _parse_block(block, question_num, seen_question_keys)
+        except _SkipQuestion as skip:
+            skipped_questions.append({'number': question_num, 'reason': skip.reason})
+            continue
         except Exception as e:
-            logger.error(f"Error processing block {i+1}: {e}\nContent: {block[:200]}...", exc_info=True)
-            skipped_questions.append({'number': f'Block {i+1}', 'reason': f'An unexpected error occurred: {e}'})
+            logger.error(f"Error processing block {i}: {e}\nContent: {block[:200]}...", exc_info=True)
+            skipped_questions.append({'number': question_num, 'reason': f'An unexpected error occurred: {e}'})
+            continue
 
-    return questions, skipped_questions
+        questions.append(question)
+        logger.info(f"Successfully parsed question {question_num}: {question['question'][:60]}...")
+
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_MAX:
+        _PARSE_CACHE.pop(next(iter(_PARSE_CACHE)))  # evict oldest insertion
+    _PARSE_CACHE[cache_key] = (questions, skipped_questions)
+    return _copy_parse_result(_PARSE_CACHE[cache_key])
+
+# The semaphore caps in-flight Bot API requests; the global bucket paces
+# dispatch at Telegram's 30 msg/s limit, and a per-chat bucket holds each
+# chat near the ~1 msg/s flood limit (with a small burst allowance) since
+# a whole quiz batch targets a single chat.
+_send_semaphore = asyncio.Semaphore(25)
+_send_bucket = TokenBucket(capacity=30.0, rate=30.0)
+_chat_buckets: Dict[int, TokenBucket] = {}
+_SEND_ATTEMPTS = 3
+
+def prune_chat_buckets(max_idle: float):
+    """Drop per-chat rate buckets idle for longer than max_idle seconds."""
+    cutoff = time.monotonic() - max_idle
+    stale = [chat_id for chat_id, bucket in _chat_buckets.items() if bucket.last < cutoff]
+    for chat_id in stale:
+        del _chat_buckets[chat_id]
+
+async def _send_quiz(bot: Bot, chat_id: int, question_text: str, q: Dict[str, Any]):
+    chat_bucket = _chat_buckets.setdefault(chat_id, TokenBucket(capacity=3.0, rate=1.0))
+    # Wait out the per-chat pacing before taking a global permit so one
+    # chat's sleepers can't occupy the whole semaphore and starve others
+    while (wait := chat_bucket.acquire()) > 0:
+        await asyncio.sleep(wait)
+    async with _send_semaphore:
+        while (wait := _send_bucket.acquire()) > 0:
+            await asyncio.sleep(wait)
+        for attempt in range(_SEND_ATTEMPTS):
+            try:
+                await bot.send_poll(
+                    chat_id=chat_id,
+                    question=question_text,
+                    options=q['options'],
+                    type='quiz',
+                    correct_option_id=q['correct_option_id'],
+                    is_anonymous=True,
+                )
+                return
+            except TelegramRetryAfter as e:
+                # Honor the server's flood wait each time; give up only
+                # after repeated throttling
+                if attempt == _SEND_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(e.retry_after)
 
 async def send_telegram_quizzes(bot: Bot, questions: List[Dict[str, Any]], chat_id: int, quiz_counter: Dict[int, int]) -> Tuple[int, int, List[str]]:
     """Send questions as Telegram quizzes with sequential numbering.
 
+    Quizzes go out concurrently via asyncio.gather so network latency
+    overlaps instead of accumulating one round-trip per quiz; a token
+    bucket keeps the dispatch rate under Telegram's flood limits.
+
     Args:
         bot: Telegram bot instance.
         questions: List of question dictionaries.
@@ -182,31 +368,25 @@ async def send_telegram_quizzes(bot: Bot, questions: List[Dict[str, Any]], chat_
     # Get the current question number for this user, default to 1 if not set
     current_question_num = quiz_counter.get(chat_id, 1)
 
+    # Assign sequential numbers up front so concurrent sends keep order
+    numbered = []
     for q in questions:
-        try:
-            original_question = q['question']
-            
-            # Remove any existing numbering to avoid confusion
-            unnumbered_question = re.sub(r'^\d+\s*[.)]\s*', '', original_question)
-            
-            # Add the new sequential number
-            numbered_question = f"{current_question_num}. {unnumbered_question}"
-
-            await bot.send_poll(
-                chat_id=chat_id,
-                question=numbered_question,
-                options=q['options'],
-                type='quiz',
-                correct_option_id=q['correct_option_id'],
-                is_anonymous=True,
-            )
-            sent_count += 1
-            current_question_num += 1
-            await asyncio.sleep(0.5)  # Avoid flood limits
-        except Exception as e:
-            logger.error(f"Error sending quiz {q.get('question_num', '?')}: {e}")
+        # Remove any existing numbering to avoid confusion
+        unnumbered_question = _LEADING_NUM_RE.sub('', q['question'])
+        numbered.append((f"{current_question_num}. {unnumbered_question}", q))
+        current_question_num += 1
+
+    results = await asyncio.gather(
+        *(_send_quiz(bot, chat_id, text, q) for text, q in numbered),
+        return_exceptions=True,
+    )
+    for (text, q), result in zip(numbered, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error sending quiz {q.get('question_num', '?')}: {result}")
             error_count += 1
             failed_questions.append(q.get('question_num', '?'))
+        else:
+            sent_count += 1
 
     # Update the counter for the user for the next batch
     quiz_counter[chat_id] = current_question_num
@@ -226,28 +406,26 @@ async def format_quiz_as_text(quiz: Poll, question_num: Optional[int] = None) ->
     """
     try:
         prefix = f"{question_num}. " if question_num is not None else ""
-        text = f"{prefix}{quiz.question}\n"
-        
-        # Robustly get correct_option_id (handles 0 as valid)
-        correct_option_id = getattr(quiz, 'correct_option_id', None)
+        parts = [prefix, quiz.question, "\n"]
+
+        # Poll.correct_option_id may legitimately be 0, so test against None
+        correct_option_id = quiz.correct_option_id
         has_correct_answer = correct_option_id is not None
-        logger.info(f"Quiz: {getattr(quiz, 'question', '')[:30]}... | correct_option_id: {correct_option_id} | options: {[getattr(opt, 'text', str(opt)) for opt in getattr(quiz, 'options', [])]}")
-        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Quiz: {quiz.question[:30]}... | correct_option_id: {correct_option_id} | options: {[opt.text for opt in quiz.options]}")
+
         # Add options with correct answer marked
         for i, option in enumerate(quiz.options):
-            option_text = option.text if hasattr(option, 'text') else str(option)
             # Just print the options, no emoji for correct answer
-            text += f"{chr(97 + i)}) {option_text}\n"  # a), b), c), d)
+            parts += (_LETTER_PREFIX[i], option.text, "\n")  # a), b), c), d)
 
         # Add explicit answer line
         if has_correct_answer:
-            correct_letter = chr(97 + correct_option_id)
-            correct_text = quiz.options[correct_option_id].text if hasattr(quiz.options[correct_option_id], 'text') else str(quiz.options[correct_option_id])
-            text += f"Answer: {correct_letter}) {correct_text}"
+            parts += ("Answer: ", _LETTER_PREFIX[correct_option_id], quiz.options[correct_option_id].text)
         else:
-            text += "Answer: Not provided"
+            parts.append("Answer: Not provided")
 
-        return text
+        return "".join(parts)
 
     except Exception as e:
         logger.error(f"Error formatting quiz: {e}", exc_info=True)
@@ -256,17 +434,23 @@ async def format_quiz_as_text(quiz: Poll, question_num: Optional[int] = None) ->
 def save_questions_to_file(questions: List[str], file_path: str) -> bool:
     """
     Save extracted questions to a text file
-    
+
+    Questions are streamed to a buffered writer one at a time, so the
+    full output never has to exist as a single joined string.
+
     Args:
-        questions: List of formatted question strings
+        questions: Iterable of formatted question strings
         file_path: Path to save the file
-        
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n\n'.join(questions))
+        with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            for i, question in enumerate(questions):
+                if i:
+                    f.write('\n\n')
+                f.write(question)
         return True
     except Exception as e:
         logger.error(f"Error saving questions to file: {e}", exc_info=True)
@@ -283,5 +467,4 @@ def get_temp_file_path(user_id: int, prefix: str = "quiz_", suffix: str = ".txt"
     Returns:
         Path to temporary file.
     """
-    os.makedirs("temp", exist_ok=True)
     return os.path.join("temp", f"{prefix}{user_id}{suffix}")